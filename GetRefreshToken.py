@@ -3,7 +3,7 @@ import requests
 
 
 url = "https://accounts.zoho.com/oauth/v2/token"
-params = {
+data = {
     "grant_type": "authorization_code",
     "client_id": client_id,
     "client_secret": client_secret,
@@ -11,5 +11,5 @@ params = {
     "code": grant_token
 }
 
-response = requests.post(url, params=params)
+response = requests.post(url, data=data)
 print(response.json())
\ No newline at end of file
@@ -1,12 +1,43 @@
+import atexit
 import csv
+import io
+import logging
+import logging.handlers
+import mmap
+import queue
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from itertools import islice
-import json, os, time, requests
+import json, os, random, socket, threading, time, requests
 from pathlib import Path
+from typing import Iterator, TextIO
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util import Retry
 from dotenv import load_dotenv
 import sys
 
+try:
+    from itertools import batched  # Python 3.12+, implementado en C
+except ImportError:
+    def batched(iterable, n):
+        it = iter(iterable)
+        while batch := tuple(islice(it, n)):
+            yield batch
+
+try:
+    import fcntl                   # solo POSIX; en Windows se omite el lock
+except ImportError:
+    fcntl = None
+
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 CLIENT_ID       = os.getenv("ZOHO_CLIENT_ID")
 CLIENT_SECRET   = os.getenv("ZOHO_CLIENT_SECRET")
 REFRESH_TOKEN   = os.getenv("ZOHO_REFRESH_TOKEN")
@@ -15,39 +46,152 @@ ORG_ID          = os.getenv("ZOHO_ORG_ID", "648703833")
 API_DOMAIN      = os.getenv("ZOHO_API_DOMAIN", BASE_URL)
 
 CACHE_FILE      = Path(__file__).with_suffix(".tokencache.json")
-SKEW            = 30           # segundos de colchón para refrescar antes de que caduque
+CACHE_LOCK      = CACHE_FILE.with_suffix(".lock")
+# SKEW es el "refresh lead time": se descuenta de expires_at al guardar el token,
+# más un jitter aleatorio para que varios procesos que comparten la cache no
+# renueven todos en el mismo instante.
+SKEW            = int(os.getenv("ZOHO_TOKEN_SKEW", "300"))
+JITTER_MAX      = int(os.getenv("ZOHO_TOKEN_JITTER_MAX", "30"))
+REFRESH_AHEAD   = 300          # segundos antes de expires_at en que se renueva en segundo plano
+REFRESH_COOLDOWN = 60          # tras un refresh en segundo plano fallido, espera antes de reintentar
+MAX_WORKERS     = int(os.getenv("ZOHO_MAX_WORKERS", "10"))  # lotes DELETE en paralelo (más alto arriesga rate limit de Zoho)
+MAX_RETRIES     = 5            # reintentos ante 429/5xx
+DOWNLOAD_CHUNK  = 1 << 20      # 1 MiB por lectura al bajar los ZIP
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter que activa SO_KEEPALIVE para conservar conexiones largas."""
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+# 429/5xx se reintentan en el adapter con backoff exponencial (respetando
+# Retry-After); el status final se devuelve al llamador para raise_for_status.
+# POST queda fuera: reintentar la creación de un bulk read cuya respuesta se
+# perdió crearía un job duplicado.
+RETRY = Retry(
+    total=MAX_RETRIES,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "DELETE"],
+    raise_on_status=False,
+)
 SESSION         = requests.Session()
+SESSION.mount("https://", KeepAliveAdapter(
+    pool_connections=32,
+    pool_maxsize=max(32, MAX_WORKERS),
+    max_retries=RETRY,
+))
+
+_refresh_lock     = threading.Lock()
+_refresh_executor = ThreadPoolExecutor(max_workers=1)
+_refresh_future   = None
+_refresh_retry_at = 0          # no relanzar el refresh en segundo plano antes de esta hora
+
+# copia en memoria del token: evita leer y parsear CACHE_FILE en cada petición
+_TOKEN_CACHE      = {"token": None, "expires_at": 0}
+_token_lock       = threading.Lock()
+# un solo hilo a la vez va a disco/OAuth; los demás esperan y reutilizan su token
+_token_fetch_lock = threading.Lock()
+
+def _remember_token(token, expires_at):
+    with _token_lock:
+        _TOKEN_CACHE["token"] = token
+        _TOKEN_CACHE["expires_at"] = expires_at
+
+def _forget_token():
+    _remember_token(None, 0)
+
+@contextmanager
+def _cache_lock(exclusive=False):
+    """flock sobre un archivo aparte para que varios procesos compartan la cache."""
+    if fcntl is None:
+        yield
+        return
+    with open(CACHE_LOCK, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
 
 def _load_cached_token():
     """Lee token y expiración del disco (si existe y sigue vivo)."""
     try:
-        data = json.loads(CACHE_FILE.read_text())
-        if data["expires_at"] - time.time() > SKEW:
+        with _cache_lock():
+            data = json.loads(CACHE_FILE.read_text())
+        if data["expires_at"] > time.time():
+            _remember_token(data["access_token"], data["expires_at"])
             return data["access_token"]
-    except Exception:
-        pass                       # archivo corrupto o inexistente
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, KeyError):
+        _discard_cached_token()              # corrupto: no volver a parsearlo
     return None
 
-def _save_cached_token(token, expires_in):
-    CACHE_FILE.write_text(json.dumps({
-        "access_token": token,
-        "expires_at": time.time() + expires_in
-    }))
+def _discard_cached_token(bad_token=None):
+    """
+    Borra CACHE_FILE si aún contiene bad_token o sigue ilegible. Se comprueba
+    bajo el lock exclusivo: otro proceso pudo haber guardado ya un token válido.
+    """
+    with _cache_lock(exclusive=True):
+        try:
+            data = json.loads(CACHE_FILE.read_text())
+            if data["access_token"] != bad_token and "expires_at" in data:
+                return
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, KeyError):
+            pass
+        CACHE_FILE.unlink(missing_ok=True)
 
-def get_access_token(force_refresh=False):
+def _save_cached_token(token, expires_in):
+    # escribir a .tmp y renombrar: un corte a mitad nunca deja la cache corrupta
+    tmp = CACHE_FILE.with_suffix(".tmp")
+    expires_at = time.time() + expires_in - SKEW - random.uniform(0, JITTER_MAX)
+    with _cache_lock(exclusive=True):
+        tmp.write_text(json.dumps({
+            "access_token": token,
+            "expires_at": expires_at
+        }))
+        os.replace(tmp, CACHE_FILE)
+    _remember_token(token, expires_at)
+
+def get_access_token(force_refresh=False, stale_token=None):
     """
     Devuelve un access_token válido.
-    * Lo lee de cache si aún está fresco.
+    * Lo toma de memoria o, si no, de la cache en disco si aún está fresco.
     * Lo renueva con el refresh_token cuando sea necesario.
+    Con force_refresh se descarta stale_token (por defecto, el token en memoria);
+    si otro hilo ya lo reemplazó mientras se esperaba, se usa el nuevo.
     """
-    if not force_refresh:
-        cached = _load_cached_token()
-        if cached:
-            return cached
-
+    with _token_lock:
+        if not force_refresh and _TOKEN_CACHE["expires_at"] > time.time():
+            return _TOKEN_CACHE["token"]
+        if force_refresh and stale_token is None:
+            stale_token = _TOKEN_CACHE["token"]
+
+    with _token_fetch_lock:
+        # doble chequeo: otro hilo pudo renovarlo mientras se esperaba el lock
+        with _token_lock:
+            token = _TOKEN_CACHE["token"]
+            fresh = _TOKEN_CACHE["expires_at"] > time.time()
+        if fresh and not (force_refresh and token == stale_token):
+            return token
+        if not force_refresh:
+            cached = _load_cached_token()
+            if cached:
+                return cached
+        return _fetch_new_token()
+
+def _fetch_new_token():
+    """Pide un access_token nuevo a OAuth y lo guarda en ambas caches."""
     resp = SESSION.post(
         "https://accounts.zoho.com/oauth/v2/token",
-        params=dict(
+        # en el body (form-urlencoded), no en la URL: así las credenciales no
+        # acaban en logs de accesos o proxies (RFC 6749 §3.2)
+        data=dict(
             refresh_token = REFRESH_TOKEN,
             client_id     = CLIENT_ID,
             client_secret = CLIENT_SECRET,
@@ -62,15 +206,45 @@ def get_access_token(force_refresh=False):
     _save_cached_token(token, expires_in)
     return token
 
+def _maybe_refresh_async():
+    """
+    Si el token está por caducar, lo renueva en segundo plano para que ninguna
+    petición pague el 401 + refresh en línea. El 401 de api_request sigue como
+    respaldo. Sin token en memoria no hace nada: ese primer token lo obtiene
+    get_access_token en línea, y lanzar otro refresh aquí sería duplicarlo.
+    """
+    global _refresh_future
+    if time.time() < _refresh_retry_at:
+        return
+    with _token_lock:
+        token = _TOKEN_CACHE["token"]
+        expires_at = _TOKEN_CACHE["expires_at"]
+    if token is None or expires_at - time.time() >= REFRESH_AHEAD:
+        return
+    with _refresh_lock:
+        if _refresh_future is None or _refresh_future.done():
+            _refresh_future = _refresh_executor.submit(get_access_token, True)
+            _refresh_future.add_done_callback(_on_refresh_done)
+
+def _on_refresh_done(future):
+    """Registra el fallo de un refresh en segundo plano y pausa los reintentos."""
+    global _refresh_retry_at
+    exc = future.exception()
+    if exc is not None:
+        _refresh_retry_at = time.time() + REFRESH_COOLDOWN
+        log.warning("Falló la renovación del token en segundo plano: %s", exc)
+
 def api_request(method, endpoint, **kwargs):
     """
     Envuelve SESSION.request añadiendo el header Authorization
     y refrescando el token automáticamente si Zoho responde 401.
     """
+    _maybe_refresh_async()
     url = f"{API_DOMAIN}{endpoint}"
     for attempt in (0, 1):                       # máx. 1 reintento
         headers = kwargs.pop("headers", {})
-        headers["Authorization"] = f"Zoho-oauthtoken {get_access_token()}"
+        token = get_access_token()
+        headers["Authorization"] = f"Zoho-oauthtoken {token}"
         resp = SESSION.request(method, url, headers=headers, **kwargs, timeout=60)
 
         if resp.status_code != 401:
@@ -79,9 +253,13 @@ def api_request(method, endpoint, **kwargs):
             return resp.json()
 
         # 401 → token caducó o inválido ⇒ fuerzo refresh y reintento
-        print("Token expirado, renovando…")
-        get_access_token(force_refresh=True)
-    resp.raise_for_status()          # si llega aquí es un 401 persistente
+        log.info("Token expirado, renovando…")
+        get_access_token(force_refresh=True, stale_token=token)
+    # si llega aquí es un 401 persistente: el token cacheado no sirve, se descarta
+    # para que el próximo proceso no lo pruebe de nuevo
+    _forget_token()
+    _discard_cached_token(token)
+    resp.raise_for_status()
 
 
 def list_fields(module_name: str):
@@ -89,7 +267,7 @@ def list_fields(module_name: str):
     for f in res.get("fields", []):
         print(f"{f['api_name']:<30} - {f.get('data_type')}")
 
-def create_bulk_read_job(module_name: str, name: str = None):
+def create_bulk_read_job(module_name: str, name: str = None, page_token: str = None):
     payload = {
         "query": {
             "module": {"api_name": module_name},
@@ -102,22 +280,26 @@ def create_bulk_read_job(module_name: str, name: str = None):
             }
         }
     }
+    if page_token:
+        # siguiente página (200k registros) de un bulk read anterior
+        payload["query"]["page_token"] = page_token
     res = api_request("POST", "/crm/bulk/v8/read", json=payload)
-    JOB_IDS_HISTORY = Path(__file__).with_suffix(".jobshistory.json")
+    # historial en JSON Lines: cada job es una línea añadida al final, sin releer
+    # ni reescribir todo el archivo
+    JOB_IDS_HISTORY = Path(__file__).with_suffix(".jobshistory.jsonl")
     dataToSave = {
-        name: name,
+        "name": name,
         "id": res["data"][0]["details"]["id"],
         "module": module_name,
     }
-    if JOB_IDS_HISTORY.exists():
-        history = json.loads(JOB_IDS_HISTORY.read_text())
-        history.append(dataToSave)
-    else:
-        history = [dataToSave]
-    JOB_IDS_HISTORY.write_text(json.dumps(history, indent=2))
+    with open(JOB_IDS_HISTORY, "a", encoding="utf-8") as f:
+        f.write(json.dumps(dataToSave) + "\n")
     return res["data"][0]["details"]["id"]
 
 def check_job_status(job_id: str):
+    # backoff exponencial con jitter: los bulk read tardan minutos, no hace
+    # falta consultar cada 5s durante todo el job
+    delay = 2.0
     while True:
         res = api_request("GET", f"/crm/bulk/v8/read/{job_id}")
         job = res["data"][0]
@@ -129,76 +311,204 @@ def check_job_status(job_id: str):
         if state in ("FAILURE", "FAILED"):
             raise RuntimeError("Bulk read job falló")
 
-        time.sleep(5)
+        time.sleep(delay + random.uniform(0, delay * 0.1))
+        delay = min(delay * 1.7, 60)
 
 
-def download_all_pages(job_id, out_prefix):
-    # Obtener info inicial
+def get_completed_result(job_id):
+    """Devuelve el result de un bulk read; falla si el job aún no terminó."""
     res = api_request("GET", f"/crm/bulk/v8/read/{job_id}")
     job = res["data"][0]
-    result = job["result"]
-
-    print("Información inicial:", result)
-
-    page = result["page"]
-    next_token = result.get("next_page_token")
-    more = result.get("more_records", False)
-
-    # Header de autorización
-    token = get_access_token()
-    headers = {"Authorization": f"Zoho-oauthtoken {token}"}
-
-    # Descargar primera página
-    url = result["download_url"]
-    r = SESSION.get(f"{API_DOMAIN}{url}", headers=headers, stream=True, timeout=60)
-    zip_name = f"{out_prefix}_page_{page}.zip"
-    with open(zip_name, "wb") as f:
-        for chunk in r.iter_content(8192):
-            f.write(chunk)
-    print(f"Descargada página {page} → {zip_name}")
-    
-def delete_batch_from_file(module, file_path):
+    if job["state"] != "COMPLETED":
+        raise RuntimeError(f"El job {job_id} todavía no está listo. Estado actual: {job['state']}")
+    return job["result"]
+
+def download_all_pages(job_results, out_prefix):
     """
-    Lee un archivo con una columna 'id' y borra en lotes de 100 usando el endpoint:
-    DELETE /crm/v8/{module}?ids=ID1,ID2,...
+    Descarga en paralelo el ZIP de cada job. Zoho entrega una sola página
+    (hasta 200k registros) por bulk read: las siguientes se piden creando otro
+    job con el next_page_token, y aquí se descargan todas juntas.
+    job_results son pares (job_id, result) de get_completed_result.
     """
-    # Leer los IDs
-    ids = []
+    def download_one(job_id, result):
+        log.info("Información del job %s: %s", job_id, result)
+
+        headers = {"Authorization": f"Zoho-oauthtoken {get_access_token()}"}
+        r = SESSION.get(f"{API_DOMAIN}{result['download_url']}", headers=headers, stream=True, timeout=60)
+        r.raise_for_status()
+        # página de Zoho + job_id: otra descarga con el mismo prefijo no lo pisa
+        page = result.get("page", 1)
+        zip_name = f"{out_prefix}_page_{page}_{job_id}.zip"
+        r.raw.decode_content = True      # descomprime gzip/deflate si el servidor lo aplica
+        with open(zip_name, "wb") as f:
+            shutil.copyfileobj(r.raw, f, length=DOWNLOAD_CHUNK)
+        log.info("Descargada página %s (job %s) → %s", page, job_id, zip_name)
+
+    job_ids, results = zip(*job_results)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # list() consume el map para que el error de cualquier descarga se propague
+        list(executor.map(download_one, job_ids, results))
+
+    last = results[-1]
+    if last.get("more_records"):
+        log.info("Quedan más registros. Crea el siguiente job con: "
+                 "create MODULE NOMBRE %s", last.get("next_page_token"))
+
+# _iter_csv_ids y _read_ids son la ruta caliente con CSV de millones de filas
+# (ver README para ejecutarlas con PyPy); van anotadas por si se compilan aparte.
+def _iter_csv_ids(csvfile: TextIO) -> Iterator[str]:
+    """Devuelve en streaming los valores de la columna 'Id' de un CSV abierto."""
+    reader = csv.reader(csvfile)
+    header = next(reader, [])
+    if "Id" not in header:
+        raise RuntimeError("El archivo debe tener una columna llamada 'Id'")
+    idx = header.index("Id")
+    # csv.reader devuelve [] en líneas en blanco (DictReader las saltaba)
+    return (row[idx] for row in reader if len(row) > idx)
+
+def _read_ids(file_path: str) -> Iterator[str]:
+    """Abre el CSV y va devolviendo sus IDs; el archivo se cierra al agotarlos."""
     with open(file_path, newline='', encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        if "Id" not in reader.fieldnames:
-            raise RuntimeError("El archivo debe tener una columna llamada 'id'")
-        for row in reader:
-            ids.append(row["Id"])
+        yield from _iter_csv_ids(csvfile)
 
-    print(f"Se leyeron {len(ids)} IDs desde {file_path}")
-
-    def chunked(iterable, size=100):
-        it = iter(iterable)
-        for first in it:
-            yield [first] + list(islice(it, size - 1))
+def _sniff_csv(file_path):
+    """
+    Valida la cabecera y estima el número de filas de un CSV sin parsearlo,
+    mapeando el archivo en memoria. Falla rápido si no hay columna 'Id'.
+    """
+    if os.path.getsize(file_path) == 0:
+        raise RuntimeError("El archivo debe tener una columna llamada 'Id'")
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = mm.find(b"\n")
+        first_line = mm[:end if end != -1 else len(mm)].decode("utf-8")
+        # mmap no tiene count(): se cuentan saltos de línea en bloques de 16 MiB
+        newlines = sum(mm[i:i + (1 << 24)].count(b"\n") for i in range(0, len(mm), 1 << 24))
+        trailing = 0 if mm[-1:] == b"\n" else 1
+    header = next(csv.reader([first_line]))
+    if "Id" not in header:
+        raise RuntimeError("El archivo debe tener una columna llamada 'Id'")
+    return newlines + trailing - 1
+
+def iter_job_ids(job_id, keep_zip=None):
+    """
+    Descarga el ZIP de un bulk read y va devolviendo los IDs de sus CSV sin
+    escribir el CSV a disco. Si se pasa keep_zip, el ZIP se guarda en esa ruta.
+    El estado del job se comprueba antes de devolver el iterador.
+    """
+    result = get_completed_result(job_id)
+    if result.get("more_records"):
+        log.info("Quedan más registros. Crea el siguiente job con: "
+                 "create MODULE NOMBRE %s", result.get("next_page_token"))
+    return _iter_result_ids(result, keep_zip)
+
+def _iter_result_ids(result, keep_zip=None):
+    """Generador que descarga el ZIP de un result y recorre sus CSV."""
+    headers = {"Authorization": f"Zoho-oauthtoken {get_access_token()}"}
+    r = SESSION.get(f"{API_DOMAIN}{result['download_url']}", headers=headers, stream=True, timeout=60)
+    r.raise_for_status()
+
+    # zipfile necesita hacer seek (el índice va al final del ZIP): se descarga a
+    # un buffer en memoria que solo pasa a disco si supera 64 MiB.
+    buf = open(keep_zip, "w+b") if keep_zip else tempfile.SpooledTemporaryFile(max_size=64 << 20)
+    r.raw.decode_content = True
+    with buf:
+        shutil.copyfileobj(r.raw, buf, length=DOWNLOAD_CHUNK)
+        with zipfile.ZipFile(buf) as zf:
+            for name in zf.namelist():
+                if not name.lower().endswith(".csv"):
+                    continue
+                with zf.open(name) as member, \
+                     io.TextIOWrapper(member, encoding="utf-8", newline="") as csvfile:
+                    yield from _iter_csv_ids(csvfile)
+
+def delete_ids(module, ids, expected=None):
+    """
+    Borra en lotes de 100 los IDs del iterable usando el endpoint:
+    DELETE /crm/v8/{module}?ids=ID1,ID2,...
+    Si se conoce el total aproximado (expected), se muestra en el progreso.
+    """
+    progress = f"/{expected}" if expected is not None else ""
 
-    token = get_access_token()
-    headers = {"Authorization": f"Zoho-oauthtoken {token}"}
+    # partes fijas de la URL calculadas una sola vez, no por lote
+    url_prefix = f"{API_DOMAIN}/crm/v8/{module}?ids="
+    url_suffix = "&wf_trigger=true"
 
-    total_deleted = 0
-    for batch in chunked(ids, 100):
-        ids_str = ",".join(batch)
-        url = f"{API_DOMAIN}/crm/v8/{module}?ids={ids_str}&wf_trigger=true"
+    def delete_one(batch):
+        # el token se pide por lote: en borrados largos puede renovarse a mitad
+        headers = {"Authorization": f"Zoho-oauthtoken {get_access_token()}"}
+        url = url_prefix + ",".join(batch) + url_suffix
         resp = SESSION.delete(url, headers=headers, timeout=60)
-        print(f"DELETE {len(batch)} → {resp.status_code}")
+        log.info("DELETE %d → %d", len(batch), resp.status_code)
         try:
-            print(resp.json())
+            log.info("%s", resp.json())
         except Exception:
-            print(resp.text)
+            log.info("%s", resp.text)
         resp.raise_for_status()
-        total_deleted += len(batch)
+        return len(batch)
+
+    # Los IDs se consumen en streaming (el primer DELETE sale tras ~100 filas) y
+    # se mantiene una ventana acotada de lotes en vuelo: executor.map consumiría
+    # todo el iterable de golpe. Así la memoria no crece con el tamaño de la entrada.
+    # Si un lote falla no se envían más: se deja de encolar, se cancelan los
+    # pendientes y se informa cuántos registros llegaron a borrarse.
+    total_deleted = 0
+    in_flight = deque()
+    failed = threading.Event()
+
+    def on_done(future):
+        if not future.cancelled() and future.exception() is not None:
+            failed.set()
 
-    print(f"Eliminación completada: {total_deleted} registros borrados.")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        try:
+            for batch in batched(ids, 100):
+                if failed.is_set():
+                    break
+                _maybe_refresh_async()
+                if len(in_flight) >= MAX_WORKERS * 2:
+                    total_deleted += in_flight.popleft().result()
+                    log.info("Borrados hasta ahora: %d%s", total_deleted, progress)
+                future = executor.submit(delete_one, batch)
+                future.add_done_callback(on_done)
+                in_flight.append(future)
+            while in_flight:
+                total_deleted += in_flight.popleft().result()
+                log.info("Borrados hasta ahora: %d%s", total_deleted, progress)
+        except BaseException:
+            # espera solo a los lotes que ya estaban en curso
+            executor.shutdown(cancel_futures=True)
+            total_deleted += sum(f.result() for f in in_flight
+                                 if not f.cancelled() and f.exception() is None)
+            log.error("Eliminación interrumpida tras borrar %d%s registros.", total_deleted, progress)
+            raise
+
+    log.info("Eliminación completada: %d registros borrados.", total_deleted)
+
+def delete_batch_from_file(module, file_path):
+    """Lee un CSV con una columna 'Id' y borra sus registros en lotes de 100."""
+    expected = _sniff_csv(file_path)
+    log.info("%s: ~%d IDs a borrar", file_path, expected)
+    delete_ids(module, _read_ids(file_path), expected)
+
+def _setup_logging():
+    """
+    Los mensajes se encolan y un hilo aparte los escribe: los workers del
+    DELETE no esperan al flush de la consola.
+    """
+    q = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    listener = logging.handlers.QueueListener(q, console)
+    listener.start()
+    atexit.register(listener.stop)
+    # el QueueHandler solo fusiona msg y args; el formato final lo da la consola
+    logging.basicConfig(level=logging.INFO, format="%(message)s",
+                        handlers=[logging.handlers.QueueHandler(q)])
 
 if __name__ == "__main__":
+    _setup_logging()
     if len(sys.argv) < 2:
-        print("Uso: python zoho_bulk.py [create|status|download|delete_batch] [args...]")
+        print("Uso: python zoho_bulk.py [create|status|download|delete_batch|delete_job] [args...]")
         sys.exit(1)
 
     action = sys.argv[1]
@@ -208,7 +518,8 @@ if __name__ == "__main__":
         if(len(sys.argv) < 4):
             print("Debes especificar el nombre del bulk read job")
             sys.exit(1)
-        job_id = create_bulk_read_job(module, sys.argv[3])
+        page_token = sys.argv[4] if len(sys.argv) > 4 else None
+        job_id = create_bulk_read_job(module, sys.argv[3], page_token)
         print(f"Nuevo job creado: {job_id}")
 
     elif action == "status":
@@ -221,22 +532,23 @@ if __name__ == "__main__":
 
     elif action == "download":
         if len(sys.argv) < 4:
-            print("Uso: download JOB_ID prefijo_salida")
+            print("Uso: download JOB_ID [JOB_ID ...] prefijo_salida")
             sys.exit(1)
 
-        job_id = sys.argv[2]
-        out_prefix = sys.argv[3]
-
-        # Consultar el estado del job
-        res = api_request("GET", f"/crm/bulk/v8/read/{job_id}")
-        job = res["data"][0]
+        job_ids = sys.argv[2:-1]
+        out_prefix = sys.argv[-1]
 
-        if job["state"] != "COMPLETED":
-            print(f"El job todavía no está listo. Estado actual: {job['state']}")
-            sys.exit(1)
+        # Consultar el estado de los jobs; su result se reutiliza en la descarga
+        job_results = []
+        for job_id in job_ids:
+            try:
+                job_results.append((job_id, get_completed_result(job_id)))
+            except RuntimeError as e:
+                print(e)
+                sys.exit(1)
 
-        print(f"Descargando todas las páginas del job {job_id}...")
-        download_all_pages(job_id, out_prefix)
+        print(f"Descargando todas las páginas de los jobs {', '.join(job_ids)}...")
+        download_all_pages(job_results, out_prefix)
     
     elif action == "list_fields":
         if len(sys.argv) < 3:
@@ -253,5 +565,20 @@ if __name__ == "__main__":
         module_name = sys.argv[2]
         file_path = sys.argv[3]
         delete_batch_from_file(module_name, file_path)
+
+    elif action == "delete_job":
+        if len(sys.argv) < 4:
+            print("Uso: delete_job MODULE JOB_ID [--keep-zip]")
+            sys.exit(1)
+
+        module_name = sys.argv[2]
+        job_id = sys.argv[3]
+        keep_zip = f"{job_id}.zip" if "--keep-zip" in sys.argv[4:] else None
+        try:
+            ids = iter_job_ids(job_id, keep_zip)
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        delete_ids(module_name, ids)
     else:
         print("Acción desconocida")